@@ -0,0 +1,39 @@
+"""covering index on prices and metrics date index
+
+Revision ID: 5c4edf724a35
+Revises: 1e9ee95e0ce8
+Create Date: 2026-08-30 10:12:41.558204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c4edf724a35"
+down_revision: Union[str, Sequence[str], None] = "1e9ee95e0ce8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rebuild ix_prices_asset_date with INCLUDE columns so /prices can be
+    # served by an index-only scan (Postgres 11+). No-op semantics elsewhere.
+    op.drop_index("ix_prices_asset_date", table_name="prices")
+    op.create_index(
+        "ix_prices_asset_date",
+        "prices",
+        ["asset_id", "date"],
+        postgresql_include=["price", "market_cap", "volume"],
+    )
+    op.create_index("ix_asset_metrics_date", "asset_metrics", ["date"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_asset_metrics_date", table_name="asset_metrics")
+    op.drop_index("ix_prices_asset_date", table_name="prices")
+    op.create_index("ix_prices_asset_date", "prices", ["asset_id", "date"])
@@ -0,0 +1,40 @@
+"""add asset_latest table
+
+Revision ID: 9b21c7d306ae
+Revises: 5c4edf724a35
+Create Date: 2026-08-30 10:31:02.877154
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b21c7d306ae"
+down_revision: Union[str, Sequence[str], None] = "5c4edf724a35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "asset_latest",
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        sa.Column("latest_date", sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(["asset_id"], ["assets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("asset_id"),
+    )
+    # backfill from existing prices
+    op.execute(
+        "INSERT INTO asset_latest (asset_id, latest_date) "
+        "SELECT asset_id, max(date) FROM prices GROUP BY asset_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("asset_latest")
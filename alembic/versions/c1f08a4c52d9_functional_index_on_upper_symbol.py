@@ -0,0 +1,34 @@
+"""functional index on upper(symbol)
+
+Revision ID: c1f08a4c52d9
+Revises: 9b21c7d306ae
+Create Date: 2026-08-30 10:44:27.391615
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c1f08a4c52d9"
+down_revision: Union[str, Sequence[str], None] = "9b21c7d306ae"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_assets_symbol_upper",
+        "assets",
+        [sa.text("upper(symbol)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_assets_symbol_upper", table_name="assets")
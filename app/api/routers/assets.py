@@ -9,12 +9,11 @@ This module supports both Pydantic v1 and v2.
 
 from typing import Iterator, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from db.models import Asset
+from app.cache import get_asset_by_symbol, list_assets_cached
 from db.session import SessionLocal
 
 # Robust Pydantic version detection:
@@ -48,27 +47,22 @@ class AssetOut(BaseModel):
             orm_mode = True
 
 
-def to_asset_out(row: Asset) -> AssetOut:
-    """Convert ORM -> Pydantic schema (works on Pydantic v1 and v2)."""
-    if PYDANTIC_V2:
-        # type: ignore[attr-defined] - exists only on v2
-        return AssetOut.model_validate(row)  # pragma: no cover
-    return AssetOut.from_orm(row)
+# Rows come straight from our own schema — skip per-row validation.
+_construct_asset = AssetOut.model_construct if PYDANTIC_V2 else AssetOut.construct
 
 
 @router.get("", response_model=List[AssetOut])
 def list_assets(
     limit: int = Query(20, ge=1, le=250, description="Max number of assets to return"),
-    db: Session = Depends(get_db),
 ) -> List[AssetOut]:
-    rows = db.execute(select(Asset).order_by(Asset.id).limit(limit)).scalars().all()
-    return [to_asset_out(r) for r in rows]
+    rows = list_assets_cached(limit)
+    return [_construct_asset(id=r[0], symbol=r[1], name=r[2], source=r[3]) for r in rows]
 
 
 @router.get("/{symbol}", response_model=AssetOut)
-def get_asset(symbol: str, db: Session = Depends(get_db)) -> AssetOut:
+def get_asset(symbol: str) -> AssetOut:
     sym = symbol.upper()
-    row = db.execute(select(Asset).where(Asset.symbol == sym)).scalar_one_or_none()
+    row = get_asset_by_symbol(sym)
     if row is None:
         raise HTTPException(status_code=404, detail=f"Asset not found: {sym}")
-    return to_asset_out(row)
+    return _construct_asset(id=row[0], symbol=row[1], name=row[2], source=row[3])
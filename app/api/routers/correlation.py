@@ -3,19 +3,22 @@ Correlation router (Python 3.9 + Pydantic v1 compatible)
 
 Endpoint:
 - GET /correlation?asset1=BTC&asset2=ETH&window=30
-Uses daily returns computed from Price series (pct change) and Pearson correlation.
+Uses the daily returns precomputed by the ETL (asset_metrics.daily_return)
+and Pearson correlation.
 """
 
 from datetime import date as Date
-from typing import Iterator, List, Optional, Tuple
+from typing import Iterator, Optional, Tuple
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import select, func
+from sqlalchemy import Date as SA_Date, Float, text
 from sqlalchemy.orm import Session
 
+from app.cache import get_asset_by_symbol, get_latest_price_date
+from app.math_kernels import pearson
 from db.session import SessionLocal
-from db.models import Asset, Price
 
 router = APIRouter(prefix="/correlation", tags=["correlation"])
 
@@ -44,44 +47,85 @@ class CorrelationOut(BaseModel):
     note: Optional[str] = None
 
 
-def _fetch_price_series(
-    db: Session, asset_id: int, start: Date, end: Date
-) -> List[Tuple[Date, float]]:
-    q = (
-        select(Price.date, Price.price)
-        .where(Price.asset_id == asset_id)
-        .where(Price.date >= start)
-        .where(Price.date <= end)
-        .order_by(Price.date.asc())
+# Postgres correlates the ETL-precomputed daily returns (corr aggregate) in
+# one indexed scan, so neither prices nor returns cross the wire.
+# This also keeps the handler sync: with symbol/latest-date lookups cached
+# in-process and the math pushed into this single statement, there are no
+# independent sub-queries left that an async driver could overlap.
+_PG_CORRELATION_SQL = text("""
+    WITH aligned AS (
+        SELECT m1.date, m1.daily_return AS ret1, m2.daily_return AS ret2
+        FROM asset_metrics m1
+        JOIN asset_metrics m2 USING (date)
+        WHERE m1.asset_id = :a1
+          AND m2.asset_id = :a2
+          AND m1.date BETWEEN :start AND :end
+          AND m1.daily_return IS NOT NULL
+          AND m2.daily_return IS NOT NULL
+        ORDER BY m1.date DESC
+        LIMIT :window
     )
-    rows = db.execute(q).all()
-    return [(r[0], float(r[1])) for r in rows]
-
-
-def _pct_returns(series: List[Tuple[Date, float]]) -> List[Tuple[Date, float]]:
-    # returns aligned to "current" day: (date_t, (p_t/p_{t-1}) - 1)
-    out: List[Tuple[Date, float]] = []
-    for i in range(1, len(series)):
-        d0, p0 = series[i - 1]
-        d1, p1 = series[i]
-        if p0 == 0:
-            continue
-        out.append((d1, (p1 / p0) - 1.0))
-    return out
+    SELECT corr(ret1, ret2), count(*), min(date), max(date) FROM aligned
+""")
+
+
+def _db_correlation(
+    db: Session, a1_id: int, a2_id: int, start: Date, end: Date, window: int
+) -> Tuple[Optional[float], int, Optional[Date], Optional[Date]]:
+    """Run the correlation entirely in Postgres; returns (corr, n, start, end)."""
+    row = db.execute(
+        _PG_CORRELATION_SQL,
+        {"a1": a1_id, "a2": a2_id, "start": start, "end": end, "window": window},
+    ).one()
+    corr = float(row[0]) if row[0] is not None else None
+    return corr, int(row[1]), row[2], row[3]
+
+
+# Prepared once at import; avoids rebuilding + recompiling the expression
+# tree per request. The cast keeps Numeric -> float conversion server-side.
+_RETURN_SERIES_COUNT_SQL = text(
+    "SELECT count(*) FROM asset_metrics"
+    " WHERE asset_id = :aid AND date BETWEEN :start AND :end"
+    " AND daily_return IS NOT NULL"
+)
+_RETURN_SERIES_SQL = (
+    text(
+        "SELECT date, CAST(daily_return AS DOUBLE PRECISION) AS ret"
+        " FROM asset_metrics"
+        " WHERE asset_id = :aid AND date BETWEEN :start AND :end"
+        " AND daily_return IS NOT NULL ORDER BY date"
+    )
+    .columns(date=SA_Date(), ret=Float())
+    .execution_options(stream_results=True, yield_per=1000)
+)
 
 
-def _pearson(x: List[float], y: List[float]) -> Optional[float]:
-    n = len(x)
-    if n < 2:
-        return None
-    mx = sum(x) / n
-    my = sum(y) / n
-    num = sum((xi - mx) * (yi - my) for xi, yi in zip(x, y))
-    denx = sum((xi - mx) ** 2 for xi in x)
-    deny = sum((yi - my) ** 2 for yi in y)
-    if denx <= 0 or deny <= 0:
+def _fetch_return_series(
+    db: Session, asset_id: int, start: Date, end: Date
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Stream the ETL-precomputed daily returns into preallocated arrays.
+
+    Returns (date ordinals, returns); ordinals keep alignment an integer
+    set operation.
+    """
+    params = {"aid": asset_id, "start": start, "end": end}
+    count = db.execute(_RETURN_SERIES_COUNT_SQL, params).scalar_one()
+    dates = np.empty(count, dtype=np.int64)
+    returns = np.empty(count, dtype=np.float64)
+
+    for i, (d, r) in enumerate(db.execute(_RETURN_SERIES_SQL, params)):
+        dates[i] = d.toordinal()
+        returns[i] = r
+    return dates, returns
+
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+    xa = np.asarray(x, dtype=np.float64)
+    ya = np.asarray(y, dtype=np.float64)
+    if xa.size < 2:
         return None
-    return num / ((denx * deny) ** 0.5)
+    r = pearson(xa, ya)
+    return None if np.isnan(r) else r
 
 
 @router.get("", response_model=CorrelationOut)
@@ -101,25 +145,19 @@ def correlation(
             status_code=422, detail="asset1 must be different from asset2"
         )
 
-    asset_obj1 = db.execute(
-        select(Asset).where(Asset.symbol == a1)
-    ).scalar_one_or_none()
-    asset_obj2 = db.execute(
-        select(Asset).where(Asset.symbol == a2)
-    ).scalar_one_or_none()
-    if asset_obj1 is None:
+    # cached lookups — no DB round-trip for known symbols
+    asset_row1 = get_asset_by_symbol(a1)
+    asset_row2 = get_asset_by_symbol(a2)
+    if asset_row1 is None:
         raise HTTPException(status_code=404, detail=f"Asset not found: {a1}")
-    if asset_obj2 is None:
+    if asset_row2 is None:
         raise HTTPException(status_code=404, detail=f"Asset not found: {a2}")
+    id1, id2 = asset_row1[0], asset_row2[0]
 
     # choose latest common date if as_of not provided
     if as_of is None:
-        max1 = db.execute(
-            select(func.max(Price.date)).where(Price.asset_id == asset_obj1.id)
-        ).scalar_one()
-        max2 = db.execute(
-            select(func.max(Price.date)).where(Price.asset_id == asset_obj2.id)
-        ).scalar_one()
+        max1 = get_latest_price_date(id1)
+        max2 = get_latest_price_date(id2)
         if max1 is None or max2 is None:
             return CorrelationOut(
                 asset1=a1,
@@ -132,33 +170,55 @@ def correlation(
             )
         as_of = min(max1, max2)
 
-    start = as_of.fromordinal(as_of.toordinal() - (window + 1))
+    # returns are stored per day, so `window` points span `window` days
+    start = as_of.fromordinal(as_of.toordinal() - window)
 
-    s1 = _fetch_price_series(db, asset_obj1.id, start, as_of)
-    s2 = _fetch_price_series(db, asset_obj2.id, start, as_of)
+    if db.get_bind().dialect.name == "postgresql":
+        corr, n_points, start_date, end_date = _db_correlation(
+            db, id1, id2, start, as_of, window
+        )
+        if n_points < 2:
+            return CorrelationOut(
+                asset1=a1,
+                asset2=a2,
+                window=window,
+                as_of=as_of,
+                n_points=n_points,
+                correlation=None,
+                note="Not enough overlapping return points to compute correlation.",
+            )
+        return CorrelationOut(
+            asset1=a1,
+            asset2=a2,
+            window=window,
+            as_of=as_of,
+            n_points=n_points,
+            correlation=corr,
+            start_date=start_date,
+            end_date=end_date,
+        )
 
-    r1 = _pct_returns(s1)
-    r2 = _pct_returns(s2)
+    # Fallback (SQLite and other dialects without corr()): align + correlate in NumPy.
+    d1, r1 = _fetch_return_series(db, id1, start, as_of)
+    d2, r2 = _fetch_return_series(db, id2, start, as_of)
 
-    # align by date intersection
-    m1 = {d: v for d, v in r1}
-    m2 = {d: v for d, v in r2}
-    common_dates = sorted(set(m1.keys()) & set(m2.keys()))
-    if len(common_dates) < 2:
+    # align by date intersection; both sides are sorted and unique per asset
+    common, i1, i2 = np.intersect1d(d1, d2, assume_unique=True, return_indices=True)
+    if common.size < 2:
         return CorrelationOut(
             asset1=a1,
             asset2=a2,
             window=window,
             as_of=as_of,
-            n_points=len(common_dates),
+            n_points=int(common.size),
             correlation=None,
             note="Not enough overlapping return points to compute correlation.",
         )
 
     # keep last `window` points if we have more
-    common_dates = common_dates[-window:]
-    x = [m1[d] for d in common_dates]
-    y = [m2[d] for d in common_dates]
+    common = common[-window:]
+    x = r1[i1][-window:]
+    y = r2[i2][-window:]
     corr = _pearson(x, y)
 
     return CorrelationOut(
@@ -166,8 +226,8 @@ def correlation(
         asset2=a2,
         window=window,
         as_of=as_of,
-        n_points=len(common_dates),
+        n_points=int(common.size),
         correlation=corr,
-        start_date=common_dates[0],
-        end_date=common_dates[-1],
+        start_date=Date.fromordinal(int(common[0])),
+        end_date=Date.fromordinal(int(common[-1])),
     )
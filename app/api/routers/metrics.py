@@ -9,11 +9,13 @@ Endpoints:
 from datetime import date as Date
 from typing import Iterator, List, Optional
 
+import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import select, func
+from sqlalchemy import Float, cast, select, func, text
 from sqlalchemy.orm import Session
 
+from app.cache import get_asset_by_symbol
 from db.session import SessionLocal
 from db.models import Asset, AssetMetric
 
@@ -39,6 +41,32 @@ class MetricOut(BaseModel):
         orm_mode = True
 
 
+# Rows come straight from our own schema — skip per-row validation.
+PYDANTIC_V2: bool = hasattr(BaseModel, "model_validate")
+_construct_metric = MetricOut.model_construct if PYDANTIC_V2 else MetricOut.construct
+
+_METRIC_VALUE_COLS = ["daily_return", "cumulative_return_30d", "volatility_30d"]
+
+# Latest row per asset in a single pass — collapses the max(date) probe and
+# the follow-up filtered query into one round-trip (Postgres only).
+_PG_LATEST_METRICS_SQL = text(
+    "SELECT DISTINCT ON (m.asset_id)"
+    " a.symbol, m.date,"
+    " CAST(m.daily_return AS DOUBLE PRECISION) AS daily_return,"
+    " CAST(m.cumulative_return_30d AS DOUBLE PRECISION) AS cumulative_return_30d,"
+    " CAST(m.volatility_30d AS DOUBLE PRECISION) AS volatility_30d"
+    " FROM asset_metrics m JOIN assets a ON a.id = m.asset_id"
+    " ORDER BY m.asset_id, m.date DESC LIMIT :limit"
+)
+
+
+def _metric_records(df: pd.DataFrame) -> List[MetricOut]:
+    # Column-wise path: one fillna over the frame instead of three None
+    # checks per row, then a single to_dict pass feeding construct().
+    df[_METRIC_VALUE_COLS] = df[_METRIC_VALUE_COLS].fillna(0.0)
+    return [_construct_metric(**r) for r in df.to_dict(orient="records")]
+
+
 @router.get("/latest", response_model=List[MetricOut])
 def latest_metrics(
     limit: int = Query(20, ge=1, le=250, description="Max number of assets to return"),
@@ -49,15 +77,23 @@ def latest_metrics(
     db: Session = Depends(get_db),
 ) -> List[MetricOut]:
     if as_of is None:
+        if db.get_bind().dialect.name == "postgresql":
+            df = pd.read_sql(
+                _PG_LATEST_METRICS_SQL, db.connection(), params={"limit": limit}
+            )
+            return _metric_records(df)
+        # SQLite has no DISTINCT ON; keep the two-step lookup
         as_of = db.execute(select(func.max(AssetMetric.date))).scalar_one()
 
     q = (
         select(
             Asset.symbol,
             AssetMetric.date,
-            AssetMetric.daily_return,
-            AssetMetric.cumulative_return_30d,
-            AssetMetric.volatility_30d,
+            cast(AssetMetric.daily_return, Float).label("daily_return"),
+            cast(AssetMetric.cumulative_return_30d, Float).label(
+                "cumulative_return_30d"
+            ),
+            cast(AssetMetric.volatility_30d, Float).label("volatility_30d"),
         )
         .join(Asset, Asset.id == AssetMetric.asset_id)
         .where(AssetMetric.date == as_of)
@@ -65,19 +101,7 @@ def latest_metrics(
         .limit(limit)
     )
 
-    rows = db.execute(q).all()
-    out: List[MetricOut] = []
-    for r in rows:
-        out.append(
-            MetricOut(
-                symbol=r[0],
-                date=r[1],
-                daily_return=float(r[2]) if r[2] is not None else 0.0,
-                cumulative_return_30d=float(r[3]) if r[3] is not None else 0.0,
-                volatility_30d=float(r[4]) if r[4] is not None else 0.0,
-            )
-        )
-    return out
+    return _metric_records(pd.read_sql(q, db.connection()))
 
 
 @router.get("/{symbol}", response_model=List[MetricOut])
@@ -90,13 +114,14 @@ def metrics_by_symbol(
     db: Session = Depends(get_db),
 ) -> List[MetricOut]:
     sym = symbol.upper()
-    asset = db.execute(select(Asset).where(Asset.symbol == sym)).scalar_one_or_none()
+    asset = get_asset_by_symbol(sym)
     if asset is None:
         raise HTTPException(status_code=404, detail=f"Asset not found: {sym}")
+    asset_id = asset[0]
 
     if as_of is None:
         as_of = db.execute(
-            select(func.max(AssetMetric.date)).where(AssetMetric.asset_id == asset.id)
+            select(func.max(AssetMetric.date)).where(AssetMetric.asset_id == asset_id)
         ).scalar_one()
 
     if as_of is None:
@@ -108,12 +133,12 @@ def metrics_by_symbol(
         select(
             Asset.symbol,
             AssetMetric.date,
-            AssetMetric.daily_return,
-            AssetMetric.cumulative_return_30d,
-            AssetMetric.volatility_30d,
+            cast(AssetMetric.daily_return, Float),
+            cast(AssetMetric.cumulative_return_30d, Float),
+            cast(AssetMetric.volatility_30d, Float),
         )
         .join(Asset, Asset.id == AssetMetric.asset_id)
-        .where(AssetMetric.asset_id == asset.id)
+        .where(AssetMetric.asset_id == asset_id)
         .where(AssetMetric.date >= start)
         .where(AssetMetric.date <= as_of)
         .order_by(AssetMetric.date.asc())
@@ -123,12 +148,12 @@ def metrics_by_symbol(
     out: List[MetricOut] = []
     for r in rows:
         out.append(
-            MetricOut(
+            _construct_metric(
                 symbol=r[0],
                 date=r[1],
-                daily_return=float(r[2]) if r[2] is not None else 0.0,
-                cumulative_return_30d=float(r[3]) if r[3] is not None else 0.0,
-                volatility_30d=float(r[4]) if r[4] is not None else 0.0,
+                daily_return=r[2] if r[2] is not None else 0.0,
+                cumulative_return_30d=r[3] if r[3] is not None else 0.0,
+                volatility_30d=r[4] if r[4] is not None else 0.0,
             )
         )
     return out
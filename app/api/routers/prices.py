@@ -2,7 +2,10 @@
 Prices router (Python 3.9 + Pydantic v1 compatible)
 
 Endpoints:
-- GET /prices/{symbol}?start=YYYY-MM-DD&end=YYYY-MM-DD
+- GET /prices/{symbol}?start=YYYY-MM-DD&end=YYYY-MM-DD&cursor=YYYY-MM-DD
+
+Pagination is keyset-based: pass `cursor` (the `next_cursor` from the previous
+page) to resume after that date. Ranges are capped at ~1 year per call.
 """
 
 from datetime import date as Date
@@ -10,11 +13,12 @@ from typing import Iterator, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import select, func
+from sqlalchemy import Float, cast, select
 from sqlalchemy.orm import Session
 
+from app.cache import get_asset_by_symbol, get_latest_price_date
 from db.session import SessionLocal
-from db.models import Asset, Price
+from db.models import Price
 
 router = APIRouter(prefix="/prices", tags=["prices"])
 
@@ -38,29 +42,44 @@ class PriceOut(BaseModel):
         orm_mode = True
 
 
-@router.get("/{symbol}", response_model=List[PriceOut])
+class PricePage(BaseModel):
+    items: List[PriceOut]
+    next_cursor: Optional[Date] = Field(
+        None, description="Pass as `cursor` to fetch the next page; null when done"
+    )
+
+
+# Rows come straight from our own schema — skip per-row validation.
+PYDANTIC_V2: bool = hasattr(BaseModel, "model_validate")
+_construct_price = PriceOut.model_construct if PYDANTIC_V2 else PriceOut.construct
+_construct_page = PricePage.model_construct if PYDANTIC_V2 else PricePage.construct
+
+
+@router.get("/{symbol}", response_model=PricePage)
 def get_prices(
     symbol: str,
     start: Optional[Date] = Query(None, description="Start date (YYYY-MM-DD)"),
     end: Optional[Date] = Query(None, description="End date (YYYY-MM-DD)"),
+    cursor: Optional[Date] = Query(
+        None, description="Keyset cursor: return rows strictly after this date"
+    ),
     limit: int = Query(
         400, ge=1, le=2000, description="Max rows returned (safety cap)"
     ),
     db: Session = Depends(get_db),
-) -> List[PriceOut]:
+) -> PricePage:
     sym = symbol.upper()
 
-    asset = db.execute(select(Asset).where(Asset.symbol == sym)).scalar_one_or_none()
+    asset = get_asset_by_symbol(sym)
     if asset is None:
         raise HTTPException(status_code=404, detail=f"Asset not found: {sym}")
+    asset_id = asset[0]
 
     # Default window: last 30 days available in DB for this asset
     if start is None or end is None:
-        max_date = db.execute(
-            select(func.max(Price.date)).where(Price.asset_id == asset.id)
-        ).scalar_one()
+        max_date = get_latest_price_date(asset_id)
         if max_date is None:
-            return []
+            return _construct_page(items=[], next_cursor=None)
         if end is None:
             end = max_date
         if start is None:
@@ -68,11 +87,24 @@ def get_prices(
 
     if start > end:
         raise HTTPException(status_code=422, detail="`start` must be <= `end`")
+    if (end.toordinal() - start.toordinal()) > 366:
+        raise HTTPException(
+            status_code=422,
+            detail="Date range too large: max 366 days per call (paginate via `cursor`).",
+        )
 
+    # cast Numeric -> double precision in the SELECT so the driver hands us
+    # floats directly instead of Decimals we'd have to convert per row
     q = (
-        select(Price.date, Price.price, Price.market_cap, Price.volume)
-        .where(Price.asset_id == asset.id)
-        .where(Price.date >= start)
+        select(
+            Price.date,
+            cast(Price.price, Float),
+            cast(Price.market_cap, Float),
+            cast(Price.volume, Float),
+        )
+        .where(Price.asset_id == asset_id)
+        # keyset resume: strictly after the cursor, otherwise from `start`
+        .where(Price.date > cursor if cursor is not None else Price.date >= start)
         .where(Price.date <= end)
         .order_by(Price.date.asc())
         .limit(limit)
@@ -82,12 +114,13 @@ def get_prices(
     out: List[PriceOut] = []
     for d, p, mc, vol in rows:
         out.append(
-            PriceOut(
-                symbol=asset.symbol,
+            _construct_price(
+                symbol=sym,
                 date=d,
-                price=float(p),
-                market_cap=float(mc) if mc is not None else None,
-                volume=float(vol) if vol is not None else None,
+                price=p,
+                market_cap=mc,
+                volume=vol,
             )
         )
-    return out
+    next_cursor = out[-1].date if len(out) == limit else None
+    return _construct_page(items=out, next_cursor=next_cursor)
@@ -0,0 +1,94 @@
+"""
+Process-local TTL cache for asset lookups.
+
+The assets table is tiny (tens of rows) and only changes at ETL cadence,
+so routers can reuse a cached row tuple instead of paying a DB round-trip
+on every request. Entries live for CACHE_TTL_SECONDS (the TTL is implemented
+by folding the current time bucket into the lru_cache key); call
+invalidate_assets() to drop everything immediately, e.g. right after an
+ETL load.
+"""
+
+import time
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from datetime import date
+
+from sqlalchemy import func, select
+
+from db.models import Asset, AssetLatest, Price
+from db.session import SessionLocal
+
+CACHE_TTL_SECONDS = 60
+
+# (id, symbol, name, source)
+AssetRow = Tuple[int, str, str, str]
+
+
+def _ttl_bucket() -> int:
+    return int(time.time() // CACHE_TTL_SECONDS)
+
+
+@lru_cache(maxsize=1024)
+def _lookup_asset(symbol: str, _bucket: int) -> Optional[AssetRow]:
+    db = SessionLocal()
+    try:
+        row = db.execute(
+            select(Asset).where(Asset.symbol == symbol)
+        ).scalar_one_or_none()
+        if row is None:
+            return None
+        return (row.id, row.symbol, row.name, row.source)
+    finally:
+        db.close()
+
+
+@lru_cache(maxsize=32)
+def _list_assets(limit: int, _bucket: int) -> Tuple[AssetRow, ...]:
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(Asset).order_by(Asset.id).limit(limit)).scalars().all()
+        return tuple((r.id, r.symbol, r.name, r.source) for r in rows)
+    finally:
+        db.close()
+
+
+@lru_cache(maxsize=1024)
+def _lookup_latest_price_date(asset_id: int, _bucket: int) -> Optional[date]:
+    db = SessionLocal()
+    try:
+        latest = db.execute(
+            select(AssetLatest.latest_date).where(AssetLatest.asset_id == asset_id)
+        ).scalar_one_or_none()
+        if latest is not None:
+            return latest
+        # asset_latest is refreshed at ETL commit; fall back to the live probe
+        # if it hasn't been populated yet
+        return db.execute(
+            select(func.max(Price.date)).where(Price.asset_id == asset_id)
+        ).scalar_one()
+    finally:
+        db.close()
+
+
+def get_asset_by_symbol(symbol: str) -> Optional[AssetRow]:
+    """Cached `SELECT * FROM assets WHERE symbol = ?` (symbol already uppercased)."""
+    return _lookup_asset(symbol, _ttl_bucket())
+
+
+def list_assets_cached(limit: int) -> List[AssetRow]:
+    """Cached `SELECT * FROM assets ORDER BY id LIMIT ?`."""
+    return list(_list_assets(limit, _ttl_bucket()))
+
+
+def get_latest_price_date(asset_id: int) -> Optional[date]:
+    """Cached latest price date per asset (asset_latest, or max(date) fallback)."""
+    return _lookup_latest_price_date(asset_id, _ttl_bucket())
+
+
+def invalidate_assets() -> None:
+    """Drop all cached asset rows (call after upserting assets)."""
+    _lookup_asset.cache_clear()
+    _list_assets.cache_clear()
+    _lookup_latest_price_date.cache_clear()
@@ -1,19 +1,35 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
-from app.api.routers.health import router as health_router
-from app.api.routers.assets import router as assets_router
-from app.api.routers.metrics import router as metrics_router
-from app.api.routers.prices import router as prices_router
-from app.api.routers.correlation import router as correlation_router
 
-app = FastAPI(
-    title="Market Data Platform API",
-    version="0.1.0",
-    description="Crypto market data platform with ETL, analytics and automated reporting.",
-)
+def create_app() -> FastAPI:
+    """Build the FastAPI app.
 
-app.include_router(health_router)
-app.include_router(assets_router)
-app.include_router(metrics_router)
-app.include_router(prices_router)
-app.include_router(correlation_router)
+    Router imports live inside the factory so they (and everything they drag
+    in — SQLAlchemy, Pydantic models, db.session) are only paid once the app
+    is actually constructed, which trims cold-start and --reload cycles.
+    """
+    from app.api.routers.health import router as health_router
+    from app.api.routers.assets import router as assets_router
+    from app.api.routers.metrics import router as metrics_router
+    from app.api.routers.prices import router as prices_router
+    from app.api.routers.correlation import router as correlation_router
+
+    application = FastAPI(
+        title="Market Data Platform API",
+        version="0.1.0",
+        description="Crypto market data platform with ETL, analytics and automated reporting.",
+        # orjson serializes large list responses several times faster than
+        # the stdlib encoder and handles date/datetime natively.
+        default_response_class=ORJSONResponse,
+    )
+
+    application.include_router(health_router)
+    application.include_router(assets_router)
+    application.include_router(metrics_router)
+    application.include_router(prices_router)
+    application.include_router(correlation_router)
+    return application
+
+
+app = create_app()
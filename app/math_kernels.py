@@ -0,0 +1,121 @@
+"""
+Hot numeric kernels shared by the API layer and the pipeline.
+
+The kernels run as single fused passes with no temporary arrays when Numba is
+installed (JIT-compiled with cache=True and warmed at import so the first
+call doesn't pay compilation), and fall back to vectorized NumPy
+implementations otherwise — numba stays an optional dependency.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is optional
+    njit = None
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def _pearson_nb(x, y):  # pragma: no cover - exercised only with numba
+        n = x.size
+        sx = sy = sxx = syy = sxy = 0.0
+        for i in range(n):
+            xi = x[i]
+            yi = y[i]
+            sx += xi
+            sy += yi
+            sxx += xi * xi
+            syy += yi * yi
+            sxy += xi * yi
+        num = n * sxy - sx * sy
+        den = math.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+        if den > 0:
+            return num / den
+        return np.nan
+
+    @njit(cache=True, fastmath=True)
+    def _rolling_ret_vol_nb(prices, window):  # pragma: no cover - numba only
+        n = prices.shape[0]
+        daily = np.full(n, np.nan)
+        cum = np.full(n, np.nan)
+        vol = np.full(n, np.nan)
+        if n < 2:
+            return daily, cum, vol
+        for i in range(1, n):
+            daily[i] = prices[i] / prices[i - 1] - 1.0
+        s = 0.0
+        sq = 0.0
+        for i in range(1, n):
+            r = daily[i]
+            s += r
+            sq += r * r
+            if i >= window:
+                if i > window:
+                    old = daily[i - window]
+                    s -= old
+                    sq -= old * old
+                mean = s / window
+                var = sq / window - mean * mean
+                vol[i] = math.sqrt(var) if var > 0.0 else 0.0
+                cum[i] = prices[i] / prices[i - window] - 1.0
+        return daily, cum, vol
+
+    # warm the JIT with trivial calls
+    _pearson_nb(np.zeros(2), np.zeros(2))
+    _rolling_ret_vol_nb(np.ones(3), 1)
+else:
+    _pearson_nb = None
+    _rolling_ret_vol_nb = None
+
+
+def pearson(x: np.ndarray, y: np.ndarray) -> float:
+    """Pearson correlation of two equal-length float64 arrays; NaN when undefined."""
+    if _pearson_nb is not None:
+        return float(
+            _pearson_nb(np.ascontiguousarray(x), np.ascontiguousarray(y))
+        )  # pragma: no cover
+    dx = x - x.mean()
+    dy = y - y.mean()
+    denom = np.sqrt((dx * dx).sum() * (dy * dy).sum())
+    if denom <= 0:
+        return float("nan")
+    return float(dx @ dy / denom)
+
+
+def _rolling_ret_vol_np(prices: np.ndarray, window: int):
+    n = prices.shape[0]
+    daily = np.full(n, np.nan)
+    cum = np.full(n, np.nan)
+    vol = np.full(n, np.nan)
+    if n < 2:
+        return daily, cum, vol
+    daily[1:] = prices[1:] / prices[:-1] - 1.0
+    if n <= window:
+        return daily, cum, vol
+    cum[window:] = prices[window:] / prices[:-window] - 1.0
+    # trailing-window mean/variance from two cumulative sums
+    r = daily[1:]
+    c1 = np.concatenate(([0.0], np.cumsum(r)))
+    c2 = np.concatenate(([0.0], np.cumsum(r * r)))
+    s = c1[window:] - c1[:-window]
+    q = c2[window:] - c2[:-window]
+    mean = s / window
+    vol[window:] = np.sqrt(np.maximum(q / window - mean * mean, 0.0))
+    return daily, cum, vol
+
+
+def rolling_ret_vol(prices: np.ndarray, window: int):
+    """Daily returns plus trailing-window cumulative return and population
+    volatility for a positive price series.
+
+    Returns three float64 arrays aligned with `prices`; positions without
+    enough history are NaN.
+    """
+    p = np.ascontiguousarray(prices, dtype=np.float64)
+    if _rolling_ret_vol_nb is not None:
+        return _rolling_ret_vol_nb(p, window)  # pragma: no cover
+    return _rolling_ret_vol_np(p, window)
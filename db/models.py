@@ -7,6 +7,7 @@ from sqlalchemy import (
     UniqueConstraint,
     Index,
     DateTime,
+    func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
@@ -26,6 +27,12 @@ class Asset(Base):
 
     prices = relationship("Price", back_populates="asset", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Functional index: symbol lookups stay an index probe even if a
+        # mixed-case row ever slips in. Routers keep .upper() normalization.
+        Index("ix_assets_symbol_upper", func.upper(symbol), unique=True),
+    )
+
 
 class Price(Base):
     __tablename__ = "prices"
@@ -44,8 +51,30 @@ class Price(Base):
 
     __table_args__ = (
         UniqueConstraint("asset_id", "date", name="uq_prices_asset_date"),
-        Index("ix_prices_asset_date", "asset_id", "date"),
+        # Covering index: INCLUDE lets Postgres serve /prices entirely from
+        # the index (index-only scan) without heap visits. Ignored elsewhere.
+        Index(
+            "ix_prices_asset_date",
+            "asset_id",
+            "date",
+            postgresql_include=["price", "market_cap", "volume"],
+        ),
+    )
+
+
+class AssetLatest(Base):
+    """Materialized latest price date per asset, refreshed at ETL commit.
+
+    Saves routers a `SELECT max(date) FROM prices WHERE asset_id=?` probe per
+    request for a value that only changes once per ETL cycle.
+    """
+
+    __tablename__ = "asset_latest"
+
+    asset_id: Mapped[int] = mapped_column(
+        ForeignKey("assets.id", ondelete="CASCADE"), primary_key=True
     )
+    latest_date: Mapped["Date"] = mapped_column(Date, nullable=False)
 
 
 class ETLRun(Base):
@@ -76,4 +105,6 @@ class AssetMetric(Base):
 
     __table_args__ = (
         Index("ix_asset_metrics_asset_date", "asset_id", "date", unique=True),
+        # /metrics/latest filters on date alone
+        Index("ix_asset_metrics_date", "date"),
     )
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from sqlalchemy import text
 
 from db.session import engine
@@ -15,9 +14,32 @@ OUT_DIR = Path("data/processed")
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def _read_df(query: str) -> pd.DataFrame:
+def _plt():
+    """Lazy pyplot: its ~300 ms import (font cache scan, backend init) is
+    paid only when a chart is actually rendered, not by CSV-only callers."""
+    import matplotlib
+
+    matplotlib.use("Agg")  # headless renderer: no GUI-backend probing
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _read_df(query: str, params: Optional[dict] = None) -> pd.DataFrame:
     with engine.connect() as conn:
-        return pd.read_sql(text(query), conn)
+        return pd.read_sql(text(query), conn, params=params)
+
+
+def _copy_csv(conn, select_sql: str, params: tuple, path: Path) -> None:
+    """Stream `COPY (select) TO STDOUT WITH CSV HEADER` straight to disk.
+
+    Postgres formats the CSV server-side, so no DataFrame is materialized.
+    """
+    raw = conn.connection.driver_connection  # psycopg connection
+    with raw.cursor() as cur, path.open("wb") as f:
+        with cur.copy(f"COPY ({select_sql}) TO STDOUT WITH CSV HEADER", params) as cp:
+            for chunk in cp:
+                f.write(chunk)
 
 
 def export_rankings(
@@ -28,19 +50,48 @@ def export_rankings(
         as_of_date = _read_df("select max(date) as d from asset_metrics")["d"].iloc[0]
         as_of_date = str(as_of_date)
 
-    df_ret = _read_df(f"""
+    ret_path = OUT_DIR / "ranking_returns_30d.csv"
+    vol_path = OUT_DIR / "ranking_volatility_30d.csv"
+
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # ORDER BY in SQL + server-side CSV; pandas only reads back the
+            # small ranked files for the callers
+            _copy_csv(
+                conn,
+                "SELECT a.symbol, m.date, m.cumulative_return_30d, m.volatility_30d"
+                " FROM asset_metrics m JOIN assets a ON a.id = m.asset_id"
+                " WHERE m.date = %s ORDER BY m.cumulative_return_30d DESC",
+                (as_of_date,),
+                ret_path,
+            )
+            _copy_csv(
+                conn,
+                "SELECT a.symbol, m.date, m.volatility_30d, m.cumulative_return_30d"
+                " FROM asset_metrics m JOIN assets a ON a.id = m.asset_id"
+                " WHERE m.date = %s ORDER BY m.volatility_30d DESC",
+                (as_of_date,),
+                vol_path,
+            )
+            return pd.read_csv(ret_path), pd.read_csv(vol_path)
+
+    # fallback (SQLite): one parameterized read, sorted in pandas
+    df_ret = _read_df(
+        """
         select a.symbol, m.date, m.cumulative_return_30d, m.volatility_30d
         from asset_metrics m
         join assets a on a.id = m.asset_id
-        where m.date = '{as_of_date}'
+        where m.date = :as_of
         order by m.cumulative_return_30d desc
-    """)
-    df_ret.to_csv(OUT_DIR / "ranking_returns_30d.csv", index=False)
+        """,
+        params={"as_of": as_of_date},
+    )
+    df_ret.to_csv(ret_path, index=False)
 
     df_vol = df_ret.sort_values("volatility_30d", ascending=False)[
         ["symbol", "date", "volatility_30d", "cumulative_return_30d"]
     ]
-    df_vol.to_csv(OUT_DIR / "ranking_volatility_30d.csv", index=False)
+    df_vol.to_csv(vol_path, index=False)
 
     return df_ret, df_vol
 
@@ -54,10 +105,24 @@ def export_correlation() -> pd.DataFrame:
         order by m.date, a.symbol
     """)
 
-    pivot = df.pivot_table(index="date", columns="symbol", values="daily_return")
-    corr = pivot.corr()
+    # One row per (date, symbol): plain unstack skips pivot_table's groupby
+    # aggregation, and np.corrcoef computes the whole matrix in one
+    # BLAS-backed product instead of pandas' per-pair dispatch.
+    wide = (
+        df.set_index(["date", "symbol"])["daily_return"].unstack("symbol").sort_index()
+    )
+    mat = wide.to_numpy(dtype=float)
+    mat = mat[~np.isnan(mat).any(axis=1)]
+    if mat.shape[0] >= 2:
+        corr = pd.DataFrame(
+            np.corrcoef(mat, rowvar=False), index=wide.columns, columns=wide.columns
+        )
+    else:
+        # too few complete rows — fall back to pairwise NaN handling
+        corr = wide.corr()
     corr.to_csv(OUT_DIR / "correlation_daily_returns.csv")
 
+    plt = _plt()
     plt.figure(figsize=(10, 8))
     plt.imshow(corr.values, aspect="auto")
     plt.xticks(range(len(corr.columns)), corr.columns, rotation=90)
@@ -65,9 +130,19 @@ def export_correlation() -> pd.DataFrame:
     plt.title("Correlation — Daily Returns")
     plt.colorbar()
     plt.tight_layout()
-    plt.savefig(OUT_DIR / "correlation_heatmap.png", dpi=200)
+    # 100 dpi halves Agg raster + PNG encode time; plenty for an NxN grid
+    heatmap_path = OUT_DIR / "correlation_heatmap.png"
+    plt.savefig(heatmap_path, dpi=100)
     plt.close()
 
+    # re-encode with Pillow's optimizer: this PNG is the largest object
+    # embedded in the PDF report
+    from PIL import Image
+
+    with Image.open(heatmap_path) as img:
+        img.load()
+        img.save(heatmap_path, optimize=True)
+
     return corr
 
 
@@ -101,6 +176,7 @@ def export_top10_price_chart(days: int = 60, top_n: int = 10) -> Path:
 
     norm = pivot / pivot.iloc[0] * 100.0
 
+    plt = _plt()
     plt.figure(figsize=(12, 6))
     plt.plot(norm.index, norm.values)
     plt.title(f"Top {top_n} — Price Performance (Normalized, base=100)")
@@ -129,6 +205,7 @@ def export_risk_return_scatter(as_of_date: Optional[str] = None) -> Path:
         order by a.symbol
     """)
 
+    plt = _plt()
     plt.figure(figsize=(10, 6))
     plt.scatter(df["volatility_30d"], df["cumulative_return_30d"])
     for _, r in df.iterrows():
@@ -173,6 +250,7 @@ def export_drawdown(symbol: str = "BTC", days: int = 60) -> Optional[Path]:
     peak = np.maximum.accumulate(prices)
     dd = (prices / peak) - 1.0
 
+    plt = _plt()
     plt.figure(figsize=(12, 4))
     plt.plot(df["date"], dd)
     plt.title(f"{symbol} — Drawdown (last {days}d)")
@@ -192,29 +270,33 @@ def export_top_correlation_pairs(n: int = 10) -> pd.DataFrame:
     corr_path = OUT_DIR / "correlation_daily_returns.csv"
     corr = pd.read_csv(corr_path, index_col=0)
 
-    pairs: List[Tuple[str, str, float]] = []
-    cols = list(corr.columns)
-    for i in range(len(cols)):
-        for j in range(i + 1, len(cols)):
-            a, b = cols[i], cols[j]
-            val = float(corr.iloc[i, j])
-            if pd.notna(val):
-                pairs.append((a, b, val))
-
-    top = sorted(pairs, key=lambda x: x[2], reverse=True)[:n]
-    df_out = pd.DataFrame(top, columns=["asset_a", "asset_b", "corr"])
+    # unique upper triangle in one gather — no O(N^2) iloc loop
+    arr = corr.to_numpy(dtype=float)
+    iu_i, iu_j = np.triu_indices(arr.shape[0], k=1)
+    v = arr[iu_i, iu_j]
+    mask = ~np.isnan(v)
+    v, ai, bj = v[mask], iu_i[mask], iu_j[mask]
+
+    order = np.argsort(v)[::-1][:n]
+    cols = corr.columns.to_numpy()
+    df_out = pd.DataFrame(
+        {"asset_a": cols[ai[order]], "asset_b": cols[bj[order]], "corr": v[order]}
+    )
     df_out.to_csv(OUT_DIR / "top_correlation_pairs.csv", index=False)
     return df_out
 
 
-def main():
-    export_rankings()
-    export_correlation()
+def main() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    df_ret, df_vol = export_rankings()
+    corr = export_correlation()
     export_top_correlation_pairs(10)
     export_top10_price_chart(days=60, top_n=10)
     export_risk_return_scatter()
     export_drawdown("BTC", days=60)
     print(f"Saved outputs to: {OUT_DIR.resolve()}")
+    # in-process callers (report.main) can take these directly and skip
+    # re-reading the CSVs just written above
+    return df_ret, df_vol, corr
 
 
 if __name__ == "__main__":
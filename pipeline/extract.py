@@ -1,20 +1,44 @@
 import re
+import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import List, Tuple, Optional, Set
-import json
+from functools import lru_cache
+from typing import Dict, List, Tuple, Optional, Set
 from pathlib import Path
-import random
 
+import numpy as np
+import orjson
+import pandas as pd
 import requests
-import requests_cache
-
-# HTTP cache (1h) to reduce calls during development
-requests_cache.install_cache("cg_cache", expire_after=3600)
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE_URL = "https://api.coingecko.com/api/v3"
 
+# Shared session: keep-alive + pooled connections amortize TLS handshakes
+# across the parallel history fetches. Retries live in urllib3 so each
+# attempt reuses the open socket (honors Retry-After on 429).
+_RETRY = Retry(
+    total=6,
+    backoff_factor=1.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=True,
+)
+SESSION = requests.Session()
+SESSION.mount(
+    "https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=_RETRY)
+)
+
+MAX_FETCH_WORKERS = 6
+
+# In-process response cache (1h) to reduce calls during development.
+# Replaces the old requests_cache SQLite monkey-patch: no disk round-trip
+# per GET and no global patching of `requests`.
+HTTP_CACHE_TTL_SECONDS = 3600
+
 logger = logging.getLogger("pipeline.extract")
 logging.basicConfig(
     level=logging.INFO,
@@ -36,16 +60,15 @@ def _ensure_dirs():
 def _load_state() -> dict:
     _ensure_dirs()
     if STATE_FILE.exists():
-        with STATE_FILE.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        return orjson.loads(STATE_FILE.read_bytes())
     return {"completed_coin_ids": [], "meta": {}}
 
 
 def _save_state(state: dict) -> None:
     _ensure_dirs()
     tmp = STATE_FILE.with_suffix(".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
+    # state stays indented — it's small and handy to eyeball
+    tmp.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2))
     tmp.replace(STATE_FILE)
 
 
@@ -55,21 +78,43 @@ def _cache_path(coin_id: str, days: int, vs_currency: str) -> Path:
 
 
 def _load_cache(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return orjson.loads(path.read_bytes())
 
 
 def _save_cache(path: Path, payload: dict) -> None:
     _ensure_dirs()
     tmp = path.with_suffix(".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False)
+    tmp.write_bytes(orjson.dumps(payload))
     tmp.replace(path)
 
 
 # --- helpers ----------------------------------------------------------------
 
 
+class _RateLimiter:
+    """
+    Enforces a minimum interval between acquisitions across threads, so the
+    parallel fetchers collectively stay under CoinGecko's rate limit.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+# compiled once — called per symbol on every markets page
+_SYMBOL_RE = re.compile(r"[A-Z0-9]{2,10}")
+
+
 def _is_valid_symbol(symbol: str) -> bool:
     """
     Accept only standard crypto symbols:
@@ -78,63 +123,47 @@ def _is_valid_symbol(symbol: str) -> bool:
     - Letters and numbers only
     (filters out things like FIGR_HELOC)
     """
-    return bool(re.fullmatch(r"[A-Z0-9]{2,10}", symbol))
+    return _SYMBOL_RE.fullmatch(symbol) is not None
 
 
-def _get_json(
-    url: str, params: Optional[dict] = None, timeout: int = 20, retries: int = 6
-) -> dict:
-    """
-    GET JSON with robust retry/backoff.
-    - Respects Retry-After on 429
-    - Exponential backoff with jitter on transient errors
-    """
-    last_err = None
-
-    for attempt in range(1, retries + 1):
-        try:
-            resp = requests.get(url, params=params, timeout=timeout)
-
-            if resp.status_code == 200:
-                return resp.json()
-
-            if resp.status_code == 429:
-                retry_after = resp.headers.get("Retry-After")
-                if retry_after is not None and retry_after.isdigit():
-                    wait = int(retry_after)
-                else:
-                    wait = min(60, int((2**attempt) + random.random()))
-                logger.warning(
-                    f"HTTP 429 (rate limit). Retry {attempt}/{retries} in {wait}s"
-                )
-                time.sleep(wait)
-                continue
+def _http_ttl_bucket() -> int:
+    # bucket changes every HTTP_CACHE_TTL_SECONDS, expiring cached responses
+    return int(time.time() // HTTP_CACHE_TTL_SECONDS)
 
-            if resp.status_code in (500, 502, 503, 504):
-                wait = min(60, int((2**attempt) + random.random()))
-                logger.warning(
-                    f"HTTP {resp.status_code}. Retry {attempt}/{retries} in {wait}s"
-                )
-                time.sleep(wait)
-                continue
 
-            resp.raise_for_status()
+def _get_json(url: str, params: Optional[dict] = None, timeout: int = 20) -> dict:
+    """GET JSON with a 1h in-memory LRU; retries/backoff live in the
+    session adapter (urllib3 Retry)."""
+    frozen = tuple(sorted(params.items())) if params else ()
+    return _get_json_cached(url, frozen, timeout, _http_ttl_bucket())
 
-        except Exception as e:
-            last_err = e
-            wait = min(60, int((2**attempt) + random.random()))
-            logger.warning(f"Request error: {e}. Retry {attempt}/{retries} in {wait}s")
-            time.sleep(wait)
 
-    raise RuntimeError(
-        f"Failed to GET {url} after {retries} retries. Last error: {last_err}"
-    )
+@lru_cache(maxsize=512)
+def _get_json_cached(url: str, frozen_params: tuple, timeout: int, _bucket: int) -> dict:
+    try:
+        resp = SESSION.get(url, params=dict(frozen_params) or None, timeout=timeout)
+        resp.raise_for_status()
+        # market_chart bodies are large numeric arrays; orjson parses them
+        # in C instead of the stdlib tokenizer behind resp.json()
+        return orjson.loads(resp.content)
+    except Exception as e:
+        raise RuntimeError(f"Failed to GET {url}: {e}") from e
 
 
-def _ms_to_utc_date(ms: int) -> str:
-    """Convert epoch milliseconds to YYYY-MM-DD (UTC)."""
-    dt = datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
-    return dt.date().isoformat()
+def _series_by_date(points: List[list]) -> pd.Series:
+    """[[timestamp_ms, value], ...] -> Series of values indexed by UTC day.
+
+    The ms -> calendar-day conversion happens in one vectorized
+    datetime64 cast instead of per-row datetime.fromtimestamp calls.
+    Duplicate days (intraday last point) keep the latest value, matching
+    the old dict-comprehension behaviour.
+    """
+    arr = np.asarray(points, dtype=np.float64)
+    if arr.size == 0:
+        return pd.Series(dtype=np.float64)
+    days = arr[:, 0].astype("int64").astype("datetime64[ms]").astype("datetime64[D]")
+    s = pd.Series(arr[:, 1], index=days)
+    return s[~s.index.duplicated(keep="last")]
 
 
 def fetch_stablecoin_ids() -> set:
@@ -235,7 +264,7 @@ def extract_top_assets_with_history(
     vs_currency: str = "usd",
     throttle_seconds: float = 5,
     use_cache: bool = True,
-) -> Tuple[List[dict], List[dict]]:
+) -> Tuple[List[dict], pd.DataFrame]:
     """
     Resume-friendly extraction:
     - Saves each coin's market_chart JSON in data/raw/coingecko/
@@ -244,7 +273,7 @@ def extract_top_assets_with_history(
     Returns (assets, prices) normalized for loading.
 
     assets: [{symbol, name, source}]
-    prices: [{symbol, date, price, market_cap, volume}]
+    prices: DataFrame with columns [symbol, date, price, market_cap, volume]
     """
     _ensure_dirs()
 
@@ -253,66 +282,85 @@ def extract_top_assets_with_history(
     state = _load_state()
     completed: Set[str] = set(state.get("completed_coin_ids", []))
 
-    all_prices: List[dict] = []
-
-    processed = 0
-
+    # (double safety) ensure symbols ok before fetching histories
+    valid_assets: List[dict] = []
     for asset in assets_raw:
-        coin_id = asset["id"]
-        symbol = asset["symbol"]  # already upper
-        # name = asset["name"]
-
-        # (double safety) ensure symbol ok
-        if not _is_valid_symbol(symbol):
+        if not _is_valid_symbol(asset["symbol"]):
             logger.info(
-                f"Skipping invalid symbol at history stage: {symbol} ({coin_id})"
+                f"Skipping invalid symbol at history stage: {asset['symbol']} ({asset['id']})"
             )
             continue
+        valid_assets.append(asset)
+        if len(valid_assets) >= limit:
+            break
 
-        processed += 1
-
+    # Resolve charts: local cache first, then parallel fetch for the misses.
+    # Workers share one keep-alive session; the rate limiter keeps the
+    # combined request rate at one call per `throttle_seconds`.
+    charts: Dict[str, dict] = {}
+    to_fetch: List[dict] = []
+    for asset in valid_assets:
+        coin_id = asset["id"]
         cache_file = _cache_path(coin_id=coin_id, days=days, vs_currency=vs_currency)
-
         if use_cache and cache_file.exists():
-            logger.info(f"[{processed}/{limit}] Using cache for {symbol} ({coin_id})")
-            chart = _load_cache(cache_file)
+            logger.info(f"Using cache for {asset['symbol']} ({coin_id})")
+            charts[coin_id] = _load_cache(cache_file)
         else:
-            logger.info(
-                f"[{processed}/{limit}] Fetching {days}d history for {symbol} ({coin_id})..."
-            )
-            chart = fetch_market_chart(
+            to_fetch.append(asset)
+
+    if to_fetch:
+        limiter = _RateLimiter(throttle_seconds)
+
+        def _fetch_throttled(coin_id: str) -> dict:
+            limiter.acquire()
+            return fetch_market_chart(
                 coin_id=coin_id, days=days, vs_currency=vs_currency
             )
-            if use_cache:
-                _save_cache(cache_file, chart)
 
-        prices_by_date = {
-            _ms_to_utc_date(ts): val for ts, val in chart.get("prices", [])
-        }
-        mcap_by_date = {
-            _ms_to_utc_date(ts): val for ts, val in chart.get("market_caps", [])
-        }
-        vol_by_date = {
-            _ms_to_utc_date(ts): val for ts, val in chart.get("total_volumes", [])
-        }
+        logger.info(
+            f"Fetching {days}d history for {len(to_fetch)} coins "
+            f"({MAX_FETCH_WORKERS} workers)..."
+        )
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as ex:
+            futures = {
+                ex.submit(_fetch_throttled, a["id"]): a["id"] for a in to_fetch
+            }
+            for fut in as_completed(futures):
+                coin_id = futures[fut]
+                chart = fut.result()
+                charts[coin_id] = chart
+                if use_cache:
+                    _save_cache(
+                        _cache_path(
+                            coin_id=coin_id, days=days, vs_currency=vs_currency
+                        ),
+                        chart,
+                    )
+
+    # one frame per coin, concatenated once — no per-row dict building
+    frames: List[pd.DataFrame] = []
 
-        dates = sorted(set(prices_by_date) | set(mcap_by_date) | set(vol_by_date))
+    processed = 0
 
-        for d in dates:
-            if d not in prices_by_date:
-                continue
+    for asset in valid_assets:
+        coin_id = asset["id"]
+        symbol = asset["symbol"]  # already upper
 
-            all_prices.append(
-                {
-                    "symbol": symbol,
-                    "date": d,
-                    "price": float(prices_by_date.get(d)),
-                    "market_cap": float(mcap_by_date.get(d))
-                    if d in mcap_by_date
-                    else None,
-                    "volume": float(vol_by_date.get(d)) if d in vol_by_date else None,
-                }
-            )
+        processed += 1
+        chart = charts[coin_id]
+
+        # align the three series on their (sorted) union of days; rows
+        # without a price are dropped, like the old dict-based merge
+        frame = pd.DataFrame(
+            {
+                "price": _series_by_date(chart.get("prices", [])),
+                "market_cap": _series_by_date(chart.get("market_caps", [])),
+                "volume": _series_by_date(chart.get("total_volumes", [])),
+            }
+        ).dropna(subset=["price"])
+        frame = frame.reset_index(names="date")
+        frame["symbol"] = symbol
+        frames.append(frame)
 
         if coin_id not in completed:
             completed.add(coin_id)
@@ -328,20 +376,26 @@ def extract_top_assets_with_history(
         if processed >= limit:
             break
 
-        time.sleep(throttle_seconds)
-
     assets_out = [
         {"symbol": a["symbol"], "name": a["name"], "source": a["source"]}
         for a in assets_raw
     ]
 
-    logger.info(f"Done. assets={len(assets_out)} price_rows={len(all_prices)}")
+    if frames:
+        prices_df = pd.concat(frames, ignore_index=True, copy=False)
+    else:
+        prices_df = pd.DataFrame(
+            columns=["date", "price", "market_cap", "volume", "symbol"]
+        )
+
+    logger.info(f"Done. assets={len(assets_out)} price_rows={len(prices_df)}")
     logger.info(f"Progress saved in: {STATE_FILE.as_posix()}")
-    return assets_out, all_prices
+    return assets_out, prices_df
 
 
 if __name__ == "__main__":
     assets, prices = extract_top_assets_with_history(limit=20, days=30)
     print(f"assets={len(assets)} prices={len(prices)}")
     print("sample asset:", assets[0])
-    print("sample price row:", prices[0])
+    print("sample price rows:")
+    print(prices.head())
@@ -1,12 +1,12 @@
 import logging
-from datetime import date
 from typing import Dict, List, Tuple, Iterable
 
-from sqlalchemy import select
+import pandas as pd
+from sqlalchemy import func, select, text
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from db.session import engine
-from db.models import Asset, Price
+from db.models import Asset, AssetLatest, Price
 
 logger = logging.getLogger("pipeline.load")
 logging.basicConfig(
@@ -16,6 +16,7 @@ logging.basicConfig(
 
 ASSETS_T = Asset.__table__
 PRICES_T = Price.__table__
+ASSET_LATEST_T = AssetLatest.__table__
 
 
 def _chunks(items: List[dict], size: int) -> Iterable[List[dict]]:
@@ -23,22 +24,32 @@ def _chunks(items: List[dict], size: int) -> Iterable[List[dict]]:
         yield items[i : i + size]
 
 
-def upsert_assets(conn, assets: List[dict]) -> int:
+def upsert_assets(conn, assets: List[dict]) -> Dict[str, int]:
+    """Upsert assets and return {symbol: id} straight from RETURNING."""
     if not assets:
-        return 0
+        return {}
 
     stmt = pg_insert(ASSETS_T).values(assets)
 
+    # WHERE keeps idempotent reruns from rewriting identical rows
+    # (no dead tuples / WAL for no-op updates)
     stmt = stmt.on_conflict_do_update(
         index_elements=[ASSETS_T.c.symbol],
         set_={
             "name": stmt.excluded.name,
             "source": stmt.excluded.source,
         },
-    ).returning(ASSETS_T.c.id)
+        where=ASSETS_T.c.name.is_distinct_from(stmt.excluded.name)
+        | ASSETS_T.c.source.is_distinct_from(stmt.excluded.source),
+    ).returning(ASSETS_T.c.symbol, ASSETS_T.c.id)
 
-    rows = conn.execute(stmt).fetchall()
-    return len(rows)
+    mapping = {r.symbol: r.id for r in conn.execute(stmt)}
+
+    # rows skipped by the no-op WHERE don't come back; select just those
+    missing = [a["symbol"] for a in assets if a["symbol"] not in mapping]
+    if missing:
+        mapping.update(fetch_asset_ids(conn, missing))
+    return mapping
 
 
 def fetch_asset_ids(conn, symbols: List[str]) -> Dict[str, int]:
@@ -54,33 +65,33 @@ def fetch_asset_ids(conn, symbols: List[str]) -> Dict[str, int]:
 
 
 def _normalize_price_rows(
-    prices: List[dict], symbol_to_id: Dict[str, int]
+    prices: pd.DataFrame, symbol_to_id: Dict[str, int]
 ) -> List[dict]:
     """
-    prices: [{symbol, date(YYYY-MM-DD), price, market_cap, volume}]
+    prices: DataFrame [symbol, date, price, market_cap, volume]
     -> rows: [{asset_id, date(date obj), price, market_cap, volume}]
+
+    Vectorized: one DataFrame pass (map + datetime64 conversion) instead
+    of a per-row dict/`date.fromisoformat` loop.
     """
-    out = []
-    for p in prices:
-        sym = p["symbol"]
-        asset_id = symbol_to_id.get(sym)
-        if not asset_id:
-            continue  # should not happen, but keep pipeline robust
-
-        # date in extract is 'YYYY-MM-DD' string
-        d = p["date"]
-        d_obj = d if isinstance(d, date) else date.fromisoformat(d)
-
-        out.append(
-            {
-                "asset_id": asset_id,
-                "date": d_obj,
-                "price": p["price"],
-                "market_cap": p.get("market_cap"),
-                "volume": p.get("volume"),
-            }
-        )
-    return out
+    if prices.empty:
+        return []
+
+    df = prices.copy()
+    df["asset_id"] = df["symbol"].map(symbol_to_id)
+    # unknown symbols should not happen, but keep pipeline robust
+    df = df.dropna(subset=["asset_id"])
+    df["asset_id"] = df["asset_id"].astype("int64")
+    # extract hands over datetime64 days; to_datetime also copes with ISO strings
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+
+    for col in ("market_cap", "volume"):
+        if col not in df.columns:
+            df[col] = None
+
+    out = df[["asset_id", "date", "price", "market_cap", "volume"]]
+    # NaN -> None so the driver writes NULLs
+    return out.astype(object).where(pd.notna(out), None).to_dict("records")
 
 
 def upsert_prices(conn, price_rows: List[dict]) -> int:
@@ -89,6 +100,8 @@ def upsert_prices(conn, price_rows: List[dict]) -> int:
 
     stmt = pg_insert(PRICES_T).values(price_rows)
 
+    # No RETURNING: serializing every touched id back over the wire just to
+    # len() it costs a result set per chunk; rowcount gives the same number.
     stmt = stmt.on_conflict_do_update(
         constraint="uq_prices_asset_date",
         set_={
@@ -96,28 +109,46 @@ def upsert_prices(conn, price_rows: List[dict]) -> int:
             "market_cap": stmt.excluded.market_cap,
             "volume": stmt.excluded.volume,
         },
-    ).returning(PRICES_T.c.id)
+        where=PRICES_T.c.price.is_distinct_from(stmt.excluded.price)
+        | PRICES_T.c.market_cap.is_distinct_from(stmt.excluded.market_cap)
+        | PRICES_T.c.volume.is_distinct_from(stmt.excluded.volume),
+    )
 
-    rows = conn.execute(stmt).fetchall()
-    return len(rows)
+    result = conn.execute(stmt)
+    return result.rowcount if result.rowcount >= 0 else len(price_rows)
+
+
+def refresh_asset_latest(conn) -> None:
+    """
+    Rebuild the materialized latest-date cache from prices so API routers can
+    skip the per-request `max(date)` probe.
+    """
+    sel = select(PRICES_T.c.asset_id, func.max(PRICES_T.c.date)).group_by(
+        PRICES_T.c.asset_id
+    )
+    stmt = pg_insert(ASSET_LATEST_T).from_select(["asset_id", "latest_date"], sel)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ASSET_LATEST_T.c.asset_id],
+        set_={"latest_date": stmt.excluded.latest_date},
+    )
+    conn.execute(stmt)
 
 
 def load_assets_and_prices(
     assets: List[dict],
-    prices: List[dict],
-    chunk_size_prices: int = 1000,
+    prices: pd.DataFrame,
+    chunk_size_prices: int = 5000,
 ) -> Tuple[int, int]:
     """
     Full load transaction:
-      1) upsert assets
-      2) fetch ids
-      3) upsert prices (chunked)
+      1) upsert assets (RETURNING gives the symbol -> id map)
+      2) upsert prices (chunked)
+      3) refresh asset_latest cache table
     """
     with engine.begin() as conn:
-        assets_touched = upsert_assets(conn, assets)
-
-        symbols = [a["symbol"] for a in assets]
-        symbol_to_id = fetch_asset_ids(conn, symbols)
+        # RETURNING symbol+id builds the map without a second SELECT
+        symbol_to_id = upsert_assets(conn, assets)
+        assets_touched = len(symbol_to_id)
 
         normalized = _normalize_price_rows(prices, symbol_to_id)
 
@@ -125,4 +156,11 @@ def load_assets_and_prices(
         for batch in _chunks(normalized, chunk_size_prices):
             prices_touched += upsert_prices(conn, batch)
 
+        refresh_asset_latest(conn)
+
+    # refresh planner stats after the bulk write (PG; safe in a txn)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE assets, prices"))
+
     return assets_touched, prices_touched
@@ -1,32 +1,68 @@
 from __future__ import annotations
 
+import importlib.util
 import os
+import warnings
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+import numpy as np
 import pandas as pd
 from jinja2 import Environment, FileSystemLoader
 
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Table,
-    TableStyle,
-    Image as RLImage,
-    PageBreak,
-)
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = BASE_DIR / "data" / "processed"
 TEMPLATE_DIR = BASE_DIR / "templates"
 REPORT_DIR = BASE_DIR / "reports"
 
+# Built once per process: auto_reload=False stops Jinja stat()ing the
+# template per render.
+_ENV = Environment(loader=FileSystemLoader(TEMPLATE_DIR), auto_reload=False)
+_TEMPLATE = _ENV.get_template("report.html.j2")
+
+# pyarrow's multithreaded CSV reader when installed (optional dep); the C
+# engine otherwise. find_spec avoids importing pyarrow just to probe it.
+_CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+# known ranking-CSV schema: explicit dtypes skip read_csv's inference pass
+_RANKING_DTYPES = {
+    "symbol": str,
+    "date": str,
+    "cumulative_return_30d": np.float64,
+    "volatility_30d": np.float64,
+}
+
+
+@lru_cache(maxsize=None)
+def _pdf_styles():
+    """Lazy one-time stylesheet — reportlab import is deferred to PDF time
+    and getSampleStyleSheet's registry is built once per process."""
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=None)
+def _ranking_table_style():
+    """One TableStyle shared by both ranking tables (ReportLab normalizes
+    and validates the command list on construction)."""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.black),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+            ("ALIGN", (0, 0), (0, -1), "LEFT"),
+        ]
+    )
+
 
 def _fmt_pct(x: float) -> str:
     try:
@@ -42,8 +78,58 @@ def _safe_read_csv(path: Path) -> pd.DataFrame:
 
 
 def _df_to_table_data(df: pd.DataFrame, max_rows: int = 15) -> list:
-    df2 = df.head(max_rows).copy()
-    return [list(df2.columns)] + df2.values.tolist()
+    # one vectorized cast; head() is already a cheap view, no copy needed
+    df2 = df.head(max_rows)
+    return [df2.columns.tolist()] + df2.astype(str).to_numpy().tolist()
+
+
+def _fast_html_table(df: pd.DataFrame) -> str:
+    """Assemble the ranking tables' HTML with plain string joins.
+
+    pandas' to_html routes every cell through its Python formatter stack;
+    the frames here are already string-formatted (_format_numeric), so a
+    direct join over the ndarray is all that's needed.
+    """
+    head = "".join(f"<th>{c}</th>" for c in df.columns)
+    body = "".join(
+        f"<tr>{''.join(f'<td>{v}</td>' for v in row)}</tr>"
+        for row in df.astype(str).to_numpy().tolist()
+    )
+    return (
+        '<table border="1" class="dataframe">'
+        f"<thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+    )
+
+
+def _format_numeric(df: pd.DataFrame, fmt: str = "%.6f") -> pd.DataFrame:
+    """Format float columns as strings in one vectorized pass per column,
+    so HTML and PDF rendering skip pandas' per-cell float_format dispatch."""
+    out = df.copy()
+    for col in out.columns:
+        if pd.api.types.is_float_dtype(out[col]):
+            out[col] = np.char.mod(fmt, out[col].to_numpy())
+    return out
+
+
+def _top_pairs(
+    corr: pd.DataFrame,
+    ia: np.ndarray,
+    ib: np.ndarray,
+    flat: np.ndarray,
+    k: int,
+    largest: bool,
+) -> list:
+    """Top/bottom-k correlation pairs via argpartition (no full sort)."""
+    k = min(k, flat.size)
+    if k == 0:
+        return []
+    keys = -flat if largest else flat
+    idx = np.argpartition(keys, k - 1)[:k]
+    idx = idx[np.argsort(keys[idx])]
+    return [
+        {"a": corr.index[ia[i]], "b": corr.columns[ib[i]], "value": float(flat[i])}
+        for i in idx
+    ]
 
 
 def _compute_insights(
@@ -54,18 +140,16 @@ def _compute_insights(
     # df_vol: symbol, volatility_30d
     out: Dict[str, Any] = {}
 
-    df_ret2 = df_ret.copy()
-    df_vol2 = df_vol.copy()
-
-    if "cumulative_return_30d" in df_ret2.columns:
-        df_ret2 = df_ret2.sort_values("cumulative_return_30d", ascending=False)
+    # both frames arrive ranked (analytics orders them in SQL / the ranked
+    # CSVs), so head/tail replace re-sorting here
+    if "cumulative_return_30d" in df_ret.columns:
         out["top_returns"] = (
-            df_ret2.head(5)[["symbol", "cumulative_return_30d"]]
+            df_ret.head(5)[["symbol", "cumulative_return_30d"]]
             .rename(columns={"cumulative_return_30d": "value"})
             .to_dict("records")
         )
         out["bottom_returns"] = (
-            df_ret2.tail(5)[["symbol", "cumulative_return_30d"]]
+            df_ret.tail(5)[["symbol", "cumulative_return_30d"]]
             .rename(columns={"cumulative_return_30d": "value"})
             .to_dict("records")
         )
@@ -73,10 +157,9 @@ def _compute_insights(
         out["top_returns"] = []
         out["bottom_returns"] = []
 
-    if "volatility_30d" in df_vol2.columns:
-        df_vol2 = df_vol2.sort_values("volatility_30d", ascending=False)
+    if "volatility_30d" in df_vol.columns:
         out["top_vol"] = (
-            df_vol2.head(5)[["symbol", "volatility_30d"]]
+            df_vol.head(5)[["symbol", "volatility_30d"]]
             .rename(columns={"volatility_30d": "value"})
             .to_dict("records")
         )
@@ -89,36 +172,29 @@ def _compute_insights(
     outlier = {"symbol": None, "avg_corr": None}
 
     if corr is not None and not corr.empty:
-        # make sure diagonal ignored
-        c = corr.copy()
-        for i in c.index:
-            if i in c.columns:
-                c.loc[i, i] = float("nan")
-
-        # Flatten
-        pairs = []
-        for a in c.index:
-            for b in c.columns:
-                if a < b:  # unique upper triangle
-                    v = c.loc[a, b]
-                    if pd.notna(v):
-                        pairs.append((a, b, float(v)))
-
-        pairs_sorted = sorted(pairs, key=lambda x: x[2], reverse=True)
-        top_corr = [{"a": a, "b": b, "value": v} for a, b, v in pairs_sorted[:5]]
-        low_corr = [
-            {"a": a, "b": b, "value": v}
-            for a, b, v in sorted(pairs, key=lambda x: x[2])[:5]
-        ]
+        # one array copy serves both the pair extraction and the outlier;
+        # fill_diagonal replaces the per-label .loc assignment loop
+        vals = corr.to_numpy(dtype=float, copy=True)
+        np.fill_diagonal(vals, np.nan)
+
+        # Unique upper triangle as one flat array — no Python pair loop,
+        # no label-based .loc lookups
+        iu = np.triu_indices(vals.shape[0], k=1)
+        flat = vals[iu]
+        mask = ~np.isnan(flat)
+        flat = flat[mask]
+        ia, ib = iu[0][mask], iu[1][mask]
+
+        top_corr = _top_pairs(corr, ia, ib, flat, 5, largest=True)
+        low_corr = _top_pairs(corr, ia, ib, flat, 5, largest=False)
 
         # Outlier: lowest average correlation (excluding nan)
-        avg = c.mean(axis=1, skipna=True)
-        if not avg.empty:
-            sym = avg.idxmin()
-            outlier = {
-                "symbol": sym,
-                "avg_corr": float(avg.loc[sym]) if pd.notna(avg.loc[sym]) else None,
-            }
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows
+            avg = np.nanmean(vals, axis=1)
+        if avg.size and not np.isnan(avg).all():
+            j = int(np.nanargmin(avg))
+            outlier = {"symbol": corr.index[j], "avg_corr": float(avg[j])}
 
     out["top_corr"] = top_corr
     out["low_corr"] = low_corr
@@ -132,8 +208,7 @@ def generate_html_report(
 ) -> Path:
     REPORT_DIR.mkdir(exist_ok=True)
 
-    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
-    template = env.get_template("report.html.j2")
+    template = _TEMPLATE
 
     def rel_from_reports(path: Path) -> str:
         # Make paths work when opening reports/market_report.html via file:// on Windows
@@ -144,8 +219,8 @@ def generate_html_report(
 
     html = template.render(
         generated_at=datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
-        returns_table=df_returns.to_html(index=False, float_format="%.6f"),
-        volatility_table=df_vol.to_html(index=False, float_format="%.6f"),
+        returns_table=_fast_html_table(df_returns),
+        volatility_table=_fast_html_table(df_vol),
         top_corr_pairs_table=(
             df_pairs.to_html(index=False, float_format="%.4f")
             if not df_pairs.empty
@@ -184,10 +259,21 @@ def generate_pdf_report(
     df_vol: pd.DataFrame,
     insights: Dict[str, Any],
 ) -> Path:
+    # reportlab's import cost is paid only when a PDF is actually built
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import (
+        SimpleDocTemplate,
+        Paragraph,
+        Spacer,
+        Table,
+        Image as RLImage,
+        PageBreak,
+    )
+
     REPORT_DIR.mkdir(exist_ok=True)
     pdf_path = REPORT_DIR / "market_report.pdf"
 
-    styles = getSampleStyleSheet()
+    styles = _pdf_styles()
     story = []
 
     story.append(
@@ -298,7 +384,10 @@ def generate_pdf_report(
         story.append(Paragraph(title, styles["Heading2"]))
         story.append(Spacer(1, 10))
         if path.exists():
-            story.append(RLImage(str(path), width=w, height=h))
+            # explicit width/height mean layout never needs the image's own
+            # size; lazy=0 decodes each PNG once up front, and the canvas
+            # dedupes repeated filenames within the document at draw time
+            story.append(RLImage(str(path), width=w, height=h, lazy=0))
         else:
             story.append(Paragraph(f"Missing image: {path}", styles["Normal"]))
         if i != len(chart_specs) - 1:
@@ -311,46 +400,17 @@ def generate_pdf_report(
         Paragraph("30-Day Cumulative Returns Ranking (Top 15)", styles["Heading2"])
     )
     story.append(Spacer(1, 8))
-    t1 = Table(
-        _df_to_table_data(
-            df_returns.sort_values("cumulative_return_30d", ascending=False),
-            max_rows=15,
-        )
-    )
-    t1.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.black),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                ("FONTSIZE", (0, 0), (-1, -1), 8),
-                ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
-                ("ALIGN", (0, 0), (0, -1), "LEFT"),
-            ]
-        )
-    )
+    # df_returns arrives ranked by cumulative return (analytics orders it)
+    t1 = Table(_df_to_table_data(df_returns, max_rows=15))
+    t1.setStyle(_ranking_table_style())
     story.append(t1)
     story.append(Spacer(1, 16))
 
     story.append(Paragraph("30-Day Volatility Ranking (Top 15)", styles["Heading2"]))
     story.append(Spacer(1, 8))
-    t2 = Table(
-        _df_to_table_data(
-            df_vol.sort_values("volatility_30d", ascending=False), max_rows=15
-        )
-    )
-    t2.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.black),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                ("FONTSIZE", (0, 0), (-1, -1), 8),
-                ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
-                ("ALIGN", (0, 0), (0, -1), "LEFT"),
-            ]
-        )
-    )
+    # df_vol arrives ranked by volatility
+    t2 = Table(_df_to_table_data(df_vol, max_rows=15))
+    t2.setStyle(_ranking_table_style())
     story.append(t2)
 
     story.append(Spacer(1, 18))
@@ -367,24 +427,76 @@ def generate_pdf_report(
         leftMargin=32,
         topMargin=32,
         bottomMargin=32,
+        # zlib-compress content streams (smaller file, less write I/O) and
+        # drop the embedded timestamp so identical inputs byte-match
+        pageCompression=1,
+        invariant=1,
     )
     doc.build(story)
     return pdf_path
 
 
-def main():
+def main(
+    df_ret: Optional[pd.DataFrame] = None,
+    df_vol: Optional[pd.DataFrame] = None,
+    df_corr: Optional[pd.DataFrame] = None,
+):
+    """Render the HTML + PDF reports.
+
+    In-process callers can pass analytics.main()'s frames directly and
+    skip the CSV encode/parse round-trip; standalone runs fall back to
+    the exported CSVs — and skip rendering entirely when the existing
+    reports are already newer than every source CSV.
+    """
     REPORT_DIR.mkdir(exist_ok=True)
 
-    df_ret = pd.read_csv(DATA_DIR / "ranking_returns_30d.csv")
-    df_vol = pd.read_csv(DATA_DIR / "ranking_volatility_30d.csv")
-    df_corr = pd.read_csv(DATA_DIR / "correlation_daily_returns.csv", index_col=0)
+    sources = [
+        DATA_DIR / "ranking_returns_30d.csv",
+        DATA_DIR / "ranking_volatility_30d.csv",
+        DATA_DIR / "correlation_daily_returns.csv",
+    ]
+    outputs = [REPORT_DIR / "market_report.html", REPORT_DIR / "market_report.pdf"]
+    if (
+        df_ret is None
+        and df_vol is None
+        and df_corr is None
+        and all(p.exists() for p in sources + outputs)
+        and min(p.stat().st_mtime for p in outputs)
+        >= max(p.stat().st_mtime for p in sources)
+    ):
+        print("Reports are up-to-date; skipping regeneration.")
+        return
+
+    if df_ret is None:
+        df_ret = pd.read_csv(
+            DATA_DIR / "ranking_returns_30d.csv",
+            dtype=_RANKING_DTYPES,
+            engine=_CSV_ENGINE,
+        )
+    if df_vol is None:
+        df_vol = pd.read_csv(
+            DATA_DIR / "ranking_volatility_30d.csv",
+            dtype=_RANKING_DTYPES,
+            engine=_CSV_ENGINE,
+        )
+    if df_corr is None:
+        # columns are the symbol set, so no static dtype map applies here
+        df_corr = pd.read_csv(
+            DATA_DIR / "correlation_daily_returns.csv",
+            index_col=0,
+            engine=_CSV_ENGINE,
+        )
 
     insights = _compute_insights(df_ret, df_vol, df_corr)
 
-    html_path = generate_html_report(df_ret, df_vol, insights)
+    # format numeric columns once; both renderers consume the same strings
+    df_ret_fmt = _format_numeric(df_ret)
+    df_vol_fmt = _format_numeric(df_vol)
+
+    html_path = generate_html_report(df_ret_fmt, df_vol_fmt, insights)
     print(f"HTML report saved to: {html_path.resolve()}")
 
-    pdf_path = generate_pdf_report(df_ret, df_vol, insights)
+    pdf_path = generate_pdf_report(df_ret_fmt, df_vol_fmt, insights)
     print(f"PDF report saved to: {pdf_path.resolve()}")
 
 
@@ -2,6 +2,7 @@ import argparse
 import logging
 from datetime import datetime
 
+import numpy as np
 from sqlalchemy import insert, update
 
 from pipeline.extract import extract_top_assets_with_history
@@ -16,79 +17,69 @@ logging.basicConfig(
 )
 
 
-def run_etl(limit: int, days: int, throttle: float, chunk_prices: int):
-    started_at = datetime.utcnow()
-
-    with engine.begin() as conn:
-        # create initial run record
-        stmt = (
-            insert(ETLRun)
-            .values(
-                started_at=started_at,
-                status="RUNNING",
-            )
-            .returning(ETLRun.id)
-        )
-
-        run_id = conn.execute(stmt).scalar()
-
-    try:
-        assets, prices = extract_top_assets_with_history(
-            limit=limit,
-            days=days + 15,
-            throttle_seconds=throttle,
-            use_cache=True,
+def _finalize_run(conn, run_id: int, status: str, **values):
+    """Close out the run record in its own short transaction."""
+    with conn.begin():
+        conn.execute(
+            update(ETLRun)
+            .where(ETLRun.id == run_id)
+            .values(finished_at=datetime.utcnow(), status=status, **values)
         )
 
-        # -------- Data Quality Checks --------
-        if not assets:
-            raise ValueError("No assets extracted")
-
-        if any(p["price"] is None or p["price"] <= 0 for p in prices):
-            raise ValueError("Invalid price detected")
 
-        assets_loaded, prices_loaded = load_assets_and_prices(
-            assets, prices, chunk_size_prices=chunk_prices
-        )
+def run_etl(limit: int, days: int, throttle: float, chunk_prices: int):
+    started_at = datetime.utcnow()
 
-        from pipeline.transform import compute_metrics
+    # one pooled connection covers the run bookkeeping (create + finalize);
+    # each statement still commits in its own short transaction, so nothing
+    # is held open across the long extract/load phase
+    with engine.connect() as conn:
+        with conn.begin():
+            run_id = conn.execute(
+                insert(ETLRun)
+                .values(started_at=started_at, status="RUNNING")
+                .returning(ETLRun.id)
+            ).scalar()
+
+        try:
+            assets, prices = extract_top_assets_with_history(
+                limit=limit,
+                days=days + 15,
+                throttle_seconds=throttle,
+                use_cache=True,
+            )
 
-        metrics_count = compute_metrics()
-        logger.info(f"Metrics computed: {metrics_count}")
+            # -------- Data Quality Checks --------
+            if not assets:
+                raise ValueError("No assets extracted")
 
-        finished_at = datetime.utcnow()
+            # single mask pass; ~(x > 0) also catches NaN
+            bad = np.flatnonzero(~(prices["price"].to_numpy(dtype=float) > 0))
+            if bad.size:
+                raise ValueError(f"Invalid price at rows {bad[:5].tolist()}")
 
-        with engine.begin() as conn:
-            stmt = (
-                update(ETLRun)
-                .where(ETLRun.id == run_id)
-                .values(
-                    finished_at=finished_at,
-                    assets_loaded=assets_loaded,
-                    prices_loaded=prices_loaded,
-                    status="SUCCESS",
-                )
+            assets_loaded, prices_loaded = load_assets_and_prices(
+                assets, prices, chunk_size_prices=chunk_prices
             )
-            conn.execute(stmt)
 
-        logger.info(f"ETL SUCCESS run_id={run_id}")
+            from pipeline.transform import compute_metrics
 
-    except Exception:
-        finished_at = datetime.utcnow()
+            metrics_count = compute_metrics()
+            logger.info(f"Metrics computed: {metrics_count}")
 
-        with engine.begin() as conn:
-            stmt = (
-                update(ETLRun)
-                .where(ETLRun.id == run_id)
-                .values(
-                    finished_at=finished_at,
-                    status="FAILED",
-                )
+            _finalize_run(
+                conn,
+                run_id,
+                "SUCCESS",
+                assets_loaded=assets_loaded,
+                prices_loaded=prices_loaded,
             )
-            conn.execute(stmt)
+            logger.info(f"ETL SUCCESS run_id={run_id}")
 
-        logger.exception(f"ETL FAILED run_id={run_id}")
-        raise
+        except Exception:
+            _finalize_run(conn, run_id, "FAILED")
+            logger.exception(f"ETL FAILED run_id={run_id}")
+            raise
 
 
 def main():
@@ -96,7 +87,7 @@ def main():
     parser.add_argument("--limit", type=int, default=20)
     parser.add_argument("--days", type=int, default=30)
     parser.add_argument("--throttle", type=float, default=2.5)
-    parser.add_argument("--chunk-prices", type=int, default=1000)
+    parser.add_argument("--chunk-prices", type=int, default=5000)
     args = parser.parse_args()
 
     run_etl(
@@ -2,15 +2,35 @@ def test_prices_symbol(client):
     r = client.get("/prices/BTC")
     assert r.status_code == 200
     data = r.json()
-    assert isinstance(data, list)
-    assert len(data) > 0
-    assert data[0]["symbol"] == "BTC"
-    assert "price" in data[0]
-    assert "date" in data[0]
+    assert isinstance(data["items"], list)
+    assert len(data["items"]) > 0
+    assert data["items"][0]["symbol"] == "BTC"
+    assert "price" in data["items"][0]
+    assert "date" in data["items"][0]
 
 
 def test_prices_symbol_range(client):
     r = client.get("/prices/BTC?start=2025-01-02&end=2025-01-05")
     assert r.status_code == 200
     data = r.json()
-    assert len(data) >= 1
+    assert len(data["items"]) >= 1
+
+
+def test_prices_keyset_cursor(client):
+    r = client.get("/prices/BTC?start=2025-01-01&end=2025-01-10&limit=4")
+    assert r.status_code == 200
+    page1 = r.json()
+    assert len(page1["items"]) == 4
+    assert page1["next_cursor"] is not None
+
+    r = client.get(
+        f"/prices/BTC?start=2025-01-01&end=2025-01-10&limit=4&cursor={page1['next_cursor']}"
+    )
+    assert r.status_code == 200
+    page2 = r.json()
+    assert page2["items"][0]["date"] > page1["items"][-1]["date"]
+
+
+def test_prices_range_too_large_422(client):
+    r = client.get("/prices/BTC?start=2020-01-01&end=2025-01-01")
+    assert r.status_code == 422